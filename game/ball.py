@@ -5,6 +5,8 @@ from physics.body import RigidBody
 import settings
 
 class Ball(RigidBody):
+    __slots__ = ('number', 'is_cue_ball', 'in_pocket', 'color', 'surface')
+
     def __init__(self, number: int, pos: Tuple[float, float], is_cue_ball: bool = False):
         super().__init__(
             pos=pos,
@@ -59,8 +61,8 @@ class Ball(RigidBody):
         if pos is None:
             pos = (settings.CUE_BALL_POS if self.is_cue_ball
                   else settings.RACK_POS)
-        self.pos = np.array(pos, dtype=float)
-        self.prev_pos = self.pos.copy()
-        self.vel = np.zeros(2, dtype=float)
-        self.force = np.zeros(2, dtype=float)
+        self.pos = pos
+        self.prev_pos = pos
+        self.vel = 0.0
+        self.force = 0.0
         self.in_pocket = False 
\ No newline at end of file
@@ -0,0 +1,154 @@
+import pygame
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from physics.world import PhysicsWorld
+from .table import Table
+from .cue import Cue
+from .ball import Ball
+import settings
+
+NUM_BALLS = 16
+OBS_FEATURES = 3  # x, y (normalised to the table) and on-table flag
+
+def play_shot(table: Table, cue: Cue, angle: float, power: float,
+              max_steps: int = 5000) -> Tuple[List[Ball], bool, int]:
+    """Shoot the cue ball and step the world until every ball is at rest.
+
+    ``angle`` and ``power`` follow Cue semantics: the cue points along
+    ``angle`` and the ball travels the opposite way. Returns the pocketed
+    object balls, whether the cue ball was scratched and the steps taken.
+    """
+    table.scratched = False
+    cue.angle = angle
+    cue.power = power
+    cue.is_shooting = True
+    cue.shoot()
+    cue.is_shooting = False
+
+    pocketed: List[Ball] = []
+    steps = 0
+    while steps < max_steps:
+        table.world.step()
+        pocketed.extend(table.check_pockets())
+        steps += 1
+        if not table.is_ball_moving():
+            break
+    return pocketed, table.scratched, steps
+
+class PoolVectorEnv:
+    """Batch of headless pool tables with a Gym-style reset/step API.
+
+    Each action is ``(angle, power)`` with power as a fraction of
+    ``settings.MAX_POWER``. Every ``step`` plays one shot per table to rest.
+    Observations, rewards and flags live in preallocated arrays that are
+    overwritten in place, so copy them if they need to outlive the next call.
+    Finished tables are reset automatically; the observation they ended on is
+    kept in ``infos["final_observation"]``.
+    """
+    def __init__(self,
+                 num_envs: int = 1,
+                 max_shots: int = 50,
+                 max_steps_per_shot: int = 5000,
+                 rack_jitter: float = 0.0,
+                 scratch_penalty: float = 1.0,
+                 seed: Optional[int] = None):
+        if not pygame.font.get_init():
+            pygame.font.init()
+
+        self.num_envs = num_envs
+        self.max_shots = max_shots
+        self.max_steps_per_shot = max_steps_per_shot
+        self.rack_jitter = rack_jitter
+        self.scratch_penalty = scratch_penalty
+        self.observation_shape = (NUM_BALLS, OBS_FEATURES)
+        self.action_shape = (2,)
+
+        self.worlds: List[PhysicsWorld] = []
+        self.tables: List[Table] = []
+        self.cues: List[Cue] = []
+        for _ in range(num_envs):
+            world = PhysicsWorld(gravity=settings.GRAVITY, dt=settings.TIME_STEP,
+                                 precision=settings.PRECISION)
+            table = Table(world)
+            self.worlds.append(world)
+            self.tables.append(table)
+            self.cues.append(Cue(table.balls[0]))
+
+        self._origin = np.array([settings.TABLE_MARGIN, settings.TABLE_MARGIN], dtype=float)
+        self._scale = 1.0 / np.array([settings.TABLE_WIDTH, settings.TABLE_HEIGHT], dtype=float)
+        self.observations = np.zeros((num_envs, NUM_BALLS, OBS_FEATURES), dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.shots = np.zeros(num_envs, dtype=np.int64)
+        self.infos: Dict[str, np.ndarray] = {
+            "final_observation": np.zeros_like(self.observations),
+            "pocketed": np.zeros(num_envs, dtype=np.int64),
+            "scratch": np.zeros(num_envs, dtype=bool),
+            "truncated": np.zeros(num_envs, dtype=bool),
+            "steps": np.zeros(num_envs, dtype=np.int64),
+        }
+        self.seed(seed)
+
+    def seed(self, seed: Optional[int] = None) -> None:
+        """Give each table its own independent random stream."""
+        streams = np.random.SeedSequence(seed).spawn(self.num_envs)
+        self.rngs = [np.random.default_rng(s) for s in streams]
+
+    def reset(self, seed: Optional[int] = None) -> np.ndarray:
+        """Re-rack every table and return the batch of observations."""
+        if seed is not None:
+            self.seed(seed)
+        for i in range(self.num_envs):
+            self._reset_env(i)
+            self._write_observation(i, self.observations[i])
+        self.rewards[:] = 0.0
+        self.dones[:] = False
+        return self.observations
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Play one shot on every table and run it to rest."""
+        actions = np.asarray(actions, dtype=float).reshape(self.num_envs, 2)
+        infos = self.infos
+        for i in range(self.num_envs):
+            table = self.tables[i]
+            angle, power = actions[i]
+            power = min(max(power, 0.0), 1.0) * settings.MAX_POWER
+            pocketed, scratch, steps = play_shot(table, self.cues[i], angle, power,
+                                                 self.max_steps_per_shot)
+            self.shots[i] += 1
+
+            eight_down = any(ball.number == 8 for ball in pocketed)
+            cleared = len(table.balls) == 1
+            truncated = self.shots[i] >= self.max_shots
+            self.rewards[i] = len(pocketed) - self.scratch_penalty * scratch
+            self.dones[i] = eight_down or cleared or truncated
+            infos["pocketed"][i] = len(pocketed)
+            infos["scratch"][i] = scratch
+            infos["truncated"][i] = truncated and not (eight_down or cleared)
+            infos["steps"][i] = steps
+
+            if self.dones[i]:
+                self._write_observation(i, infos["final_observation"][i])
+                self._reset_env(i)
+            self._write_observation(i, self.observations[i])
+        return self.observations, self.rewards, self.dones, infos
+
+    def _reset_env(self, i: int) -> None:
+        world = self.worlds[i]
+        self.tables[i].rack(self.rack_jitter, self.rngs[i])
+        world.contact_manager.clear()
+        world.contact_events.reset()
+        # Pocket confetti only matters on screen; drop it so it cannot pile up.
+        world.particle_system.emitters.clear()
+        world.particle_system.particles.clear()
+        self.shots[i] = 0
+
+    def _write_observation(self, i: int, out: np.ndarray) -> None:
+        for ball in self.tables[i].all_balls:
+            row = out[ball.number]
+            if ball.in_pocket:
+                row[:] = 0.0
+            else:
+                row[0] = (ball.pos[0] - self._origin[0]) * self._scale[0]
+                row[1] = (ball.pos[1] - self._origin[1]) * self._scale[1]
+                row[2] = 1.0
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import math
+import sqlite3
+import pygame
+from collections import OrderedDict, namedtuple
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+import physics.world as world_module
+from physics.world import PhysicsWorld, StepStats
+from .table import Table
+from .cue import Cue
+from .env import play_shot
+import settings
+
+CACHE_VERSION = 3  # Bump when the simulation itself changes
+CacheInfo = namedtuple('CacheInfo', ['hits', 'disk_hits', 'misses', 'currsize', 'maxsize'])
+
+@dataclass(frozen=True)
+class ShotOutcome:
+    """Where a shot leaves the table once every ball is at rest."""
+    positions: Mapping[int, Tuple[float, float]]  # Ball number -> position, balls still on the table
+    pocketed: Tuple[int, ...]
+    scratch: bool
+    steps: int
+
+    def __post_init__(self) -> None:
+        # Outcomes are shared by every cache hit, so positions must be read-only too
+        object.__setattr__(self, "positions", MappingProxyType(dict(self.positions)))
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "positions": [[number, x, y] for number, (x, y) in sorted(self.positions.items())],
+            "pocketed": list(self.pocketed),
+            "scratch": self.scratch,
+            "steps": self.steps,
+        })
+
+    @classmethod
+    def from_json(cls, text: str) -> "ShotOutcome":
+        data = json.loads(text)
+        positions = {int(number): (float(x), float(y)) for number, x, y in data["positions"]}
+        return cls(positions, tuple(int(n) for n in data["pocketed"]),
+                   bool(data["scratch"]), int(data["steps"]))
+
+class ShotCache:
+    """Memoizes "simulate shot to rest" on a quantized table state.
+
+    Ball positions are snapped to ``position_quantum`` and angle/power to
+    their quanta; the shot is simulated from the snapped layout, so a cached
+    outcome is exactly what re-simulating that key would give. Every key
+    includes a fingerprint of the engine and table settings, so changing
+    friction, restitution, timestep etc. never returns a stale outcome.
+    Results sit in a bounded LRU and, with ``path``, in an SQLite file that
+    other processes can share.
+    """
+    def __init__(self,
+                 maxsize: int = 1024,
+                 path: Optional[str] = None,
+                 position_quantum: float = 0.5,
+                 angle_quantum: float = 1e-3,
+                 power_quantum: float = 1.0,
+                 max_steps: int = 5000):
+        self.maxsize = maxsize
+        self.path = path
+        self.position_quantum = position_quantum
+        self.angle_quantum = angle_quantum
+        self.power_quantum = power_quantum
+        self.max_steps = max_steps
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, ShotOutcome]" = OrderedDict()
+        self._fingerprint: Optional[str] = None
+        self._sandbox: Optional[Tuple[Table, Cue]] = None
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS shots "
+                             "(key TEXT PRIMARY KEY, fingerprint TEXT, outcome TEXT)")
+            self._db.commit()
+
+    def simulate(self, table: Table, angle: float, power: float) -> ShotOutcome:
+        """Outcome of shooting from ``table``'s current layout; ``table`` is not modified."""
+        fingerprint = self.fingerprint(table)
+        if fingerprint != self._fingerprint:
+            # Engine settings changed: nothing in memory is valid any more.
+            self._memory.clear()
+            self._fingerprint = fingerprint
+
+        layout, angle_q, power_q = self.quantize(table, angle, power)
+        key = self._key(fingerprint, layout, angle_q, power_q)
+
+        outcome = self._memory.get(key)
+        if outcome is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return outcome
+
+        outcome = self._load(key)
+        if outcome is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            outcome = self._run(table, layout, angle_q * self.angle_quantum,
+                                power_q * self.power_quantum)
+            self._store(key, fingerprint, outcome)
+        self._remember(key, outcome)
+        return outcome
+
+    def quantize(self, table: Table, angle: float, power: float):
+        """Snapped layout (number -> grid cell), angle step and power step."""
+        q = self.position_quantum
+        layout = tuple(sorted((ball.number, round(ball.pos[0] / q), round(ball.pos[1] / q))
+                              for ball in table.balls))
+        # Wrap the step index too, so angles just below 2*pi share a bucket with 0
+        steps = round(2 * math.pi / self.angle_quantum)
+        angle_q = round((angle % (2 * math.pi)) / self.angle_quantum) % steps
+        return layout, angle_q, round(power / self.power_quantum)
+
+    def fingerprint(self, table: Table) -> str:
+        """Digest of every setting that can change a shot's outcome."""
+        world = table.world
+        contact = world.contact_manager
+        balls = sorted((ball.number, ball.radius, ball.mass, ball.restitution, ball.friction,
+                        ball.category, ball.mask)
+                       for ball in table.all_balls)
+        state = (
+            CACHE_VERSION,
+            world.dt, tuple(world.gravity.tolist()), world.dtype.str, world.iterations,
+            world_module.SUBSTEPS, world_module.CUSHION_DAMPING,
+            world.adaptive_substeps, world.min_substeps, world.max_substeps,
+            world.max_travel, world.penetration_tolerance,
+            contact.iterations, contact.correction, contact.slop,
+            contact.restitution_threshold, contact.warm_start,
+            tuple(tuple(p1.tolist()) + tuple(p2.tolist()) for p1, p2 in world.static_lines),
+            tuple(table.pockets), balls,
+            world.static_category, self._ignored_numbers(table),
+            settings.POCKET_RADIUS, settings.TABLE_MARGIN,
+            settings.WINDOW_WIDTH, settings.WINDOW_HEIGHT,
+            settings.CUE_BALL_POS, self.max_steps,
+        )
+        return hashlib.blake2b(repr(state).encode(), digest_size=16).hexdigest()
+
+    def info(self) -> CacheInfo:
+        """Hit/miss statistics, like functools.lru_cache's cache_info()."""
+        return CacheInfo(self.hits, self.disk_hits, self.misses, len(self._memory), self.maxsize)
+
+    def clear(self) -> None:
+        """Drop every cached outcome, on disk too, and reset statistics."""
+        self._memory.clear()
+        self.hits = self.disk_hits = self.misses = 0
+        if self._db is not None:
+            self._db.execute("DELETE FROM shots")
+            self._db.commit()
+
+    def purge_stale(self) -> None:
+        """Delete on-disk outcomes recorded under other settings."""
+        if self._db is not None and self._fingerprint is not None:
+            self._db.execute("DELETE FROM shots WHERE fingerprint != ?", (self._fingerprint,))
+            self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @staticmethod
+    def _ignored_numbers(table: Table) -> Tuple[Tuple[int, int], ...]:
+        """The world's ignored pairs as ball-number pairs (pairs not between balls are dropped)."""
+        numbers = {id(ball): ball.number for ball in table.all_balls}
+        pairs = []
+        for a, b in table.world.ignored_pairs:
+            if a in numbers and b in numbers:
+                pairs.append(tuple(sorted((numbers[a], numbers[b]))))
+        return tuple(sorted(pairs))
+
+    def _key(self, fingerprint: str, layout, angle_q: int, power_q: int) -> str:
+        raw = repr((fingerprint, layout, angle_q, power_q)).encode()
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    def _remember(self, key: str, outcome: ShotOutcome) -> None:
+        self._memory[key] = outcome
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[ShotOutcome]:
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT outcome FROM shots WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return ShotOutcome.from_json(row[0])
+        except (TypeError, ValueError, KeyError):
+            return None  # Unreadable row (e.g. written by an older version): simulate again
+
+    def _store(self, key: str, fingerprint: str, outcome: ShotOutcome) -> None:
+        if self._db is None:
+            return
+        self._db.execute("INSERT OR REPLACE INTO shots VALUES (?, ?, ?)",
+                         (key, fingerprint, outcome.to_json()))
+        self._db.commit()
+
+    def _run(self, source: Table, layout, angle: float, power: float) -> ShotOutcome:
+        """Simulate on a private table configured like ``source``."""
+        table, cue = self._prepare_sandbox(source)
+        q = self.position_quantum
+        table.set_layout({number: (x * q, y * q) for number, x, y in layout})
+        pocketed, scratch, steps = play_shot(table, cue, angle, power, self.max_steps)
+        positions = {ball.number: (float(ball.pos[0]), float(ball.pos[1])) for ball in table.balls}
+        table.world.particle_system.emitters.clear()
+        table.world.particle_system.particles.clear()
+        return ShotOutcome(positions, tuple(ball.number for ball in pocketed), scratch, steps)
+
+    def _prepare_sandbox(self, source: Table) -> Tuple[Table, Cue]:
+        src = source.world
+        if self._sandbox is None or self._sandbox[0].world.dtype != src.dtype:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            world = PhysicsWorld(gravity=tuple(src.gravity), dt=src.dt, precision=src.dtype.name)
+            table = Table(world)
+            self._sandbox = (table, Cue(table.all_balls[0]))
+        table, cue = self._sandbox
+        world = table.world
+
+        world.dt = src.dt
+        world.gravity[:] = src.gravity
+        for name in ('iterations', 'adaptive_substeps', 'min_substeps', 'max_substeps',
+                     'max_travel', 'penetration_tolerance'):
+            setattr(world, name, getattr(src, name))
+        for name in ('iterations', 'correction', 'slop', 'restitution_threshold', 'warm_start'):
+            setattr(world.contact_manager, name, getattr(src.contact_manager, name))
+        # Start from a clean history so outcomes only depend on the key
+        world.contact_manager.clear()
+        world.contact_events.reset()
+        world.stats = StepStats()
+        world.clear_static_lines()
+        for p1, p2 in src.static_lines:
+            world.add_static_line(p1, p2)
+        world.static_category = src.static_category
+        table.pockets = list(source.pockets)
+        by_number = {ball.number: ball for ball in source.all_balls}
+        for ball in table.all_balls:
+            src_ball = by_number.get(ball.number)
+            if src_ball is not None:
+                ball.radius = src_ball.radius
+                ball.mass = src_ball.mass
+                ball.inv_mass = src_ball.inv_mass
+                ball.restitution = src_ball.restitution
+                ball.friction = src_ball.friction
+                ball.category = src_ball.category
+                ball.mask = src_ball.mask
+        by_number = {ball.number: ball for ball in table.all_balls}
+        world.ignored_pairs.clear()
+        for a, b in self._ignored_numbers(source):
+            world.ignore_pair(by_number[a], by_number[b])
+        return table, cue
@@ -1,6 +1,6 @@
 import pygame
 import numpy as np
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from physics.world import PhysicsWorld
 from .ball import Ball
 import settings
@@ -10,7 +10,10 @@ class Table:
     def __init__(self, world: PhysicsWorld):
         self.world = world
         self.balls: List[Ball] = []
+        self.all_balls: List[Ball] = []
         self.pockets: List[tuple] = []
+        self.scratched = False  # Set when check_pockets respots the cue ball
+        self._rack = self.rack_positions()
         self._setup_table()
         self._setup_balls()
 
@@ -42,12 +45,18 @@ class Table:
 
     def _setup_balls(self) -> None:
         """Setup initial ball positions."""
-        cue_ball = Ball(0, settings.CUE_BALL_POS)
-        self.balls.append(cue_ball)
-        self.world.add_body(cue_ball)
+        self.all_balls = [Ball(0, settings.CUE_BALL_POS, is_cue_ball=True)]
+        self.all_balls.extend(Ball(number, pos) for number, pos in self._rack)
+        for ball in self.all_balls:
+            self.balls.append(ball)
+            self.world.add_body(ball)
 
+    @staticmethod
+    def rack_positions() -> List[tuple]:
+        """(number, position) of each object ball in the initial rack."""
         ball_order = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15]
         start_x, start_y = settings.RACK_POS
+        positions = []
         idx = 0
         for row in range(5):
             y = start_y + (row - 2) * settings.BALL_RADIUS * np.sqrt(3)
@@ -55,10 +64,38 @@ class Table:
                 if idx >= len(ball_order):
                     break
                 x = start_x + (col - row/2) * settings.BALL_RADIUS * 2
-                ball = Ball(ball_order[idx], (x, y))
+                positions.append((ball_order[idx], (x, y)))
+                idx += 1
+        return positions
+
+    def rack(self, jitter: float = 0.0, rng: Optional[np.random.Generator] = None) -> None:
+        """Put every ball back in its starting spot, reusing the existing balls."""
+        for ball in self.balls:
+            self.world.remove_body(ball)
+        self.balls.clear()
+        self.scratched = False
+        self.all_balls[0].reset(settings.CUE_BALL_POS)
+        for ball, (_, pos) in zip(self.all_balls[1:], self._rack):
+            if jitter and rng is not None:
+                pos = np.add(pos, rng.uniform(-jitter, jitter, 2))
+            ball.reset(pos)
+        for ball in self.all_balls:
+            self.balls.append(ball)
+            self.world.add_body(ball)
+
+    def set_layout(self, layout: Dict[int, Tuple[float, float]]) -> None:
+        """Place the balls named in ``layout`` (number -> position) at rest; pocket the rest."""
+        for ball in self.balls:
+            self.world.remove_body(ball)
+        self.balls.clear()
+        self.scratched = False
+        for ball in self.all_balls:
+            if ball.number in layout:
+                ball.reset(layout[ball.number])
                 self.balls.append(ball)
                 self.world.add_body(ball)
-                idx += 1
+            else:
+                ball.in_pocket = True
 
     def check_pockets(self) -> List[Ball]:
         """Check for pocketed balls."""
@@ -67,9 +104,11 @@ class Table:
             for pocket in self.pockets:
                 distance = np.linalg.norm(np.array(ball.pos) - np.array(pocket))
                 if distance < settings.POCKET_RADIUS:
-                    if ball.number == 0:
-                        ball.reset()
+                    if ball.is_cue_ball:
+                        ball.reset(settings.CUE_BALL_POS)
+                        self.scratched = True
                     else:
+                        ball.in_pocket = True
                         pocketed_balls.append(ball)
                         self.balls.remove(ball)
                         self.world.remove_body(ball)
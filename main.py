@@ -12,7 +12,8 @@ class Game:
         pygame.display.set_caption("8-Ball Pool")
         self.clock = pygame.time.Clock()
         
-        self.world = PhysicsWorld(gravity=settings.GRAVITY, dt=settings.TIME_STEP)
+        self.world = PhysicsWorld(gravity=settings.GRAVITY, dt=settings.TIME_STEP,
+                                  precision=settings.PRECISION)
         self.table = Table(self.world)
         self.cue = Cue(self.table.balls[0])
         
@@ -32,8 +33,8 @@ class Game:
 
     def reset_game(self):
         """Reset game state."""
-        self.world.bodies.clear()
-        self.world.static_lines.clear()
+        self.world.clear_bodies()
+        self.world.clear_static_lines()
         self.table = Table(self.world)
         self.cue = Cue(self.table.balls[0])
 
@@ -2,6 +2,10 @@ import pygame
 import numpy as np
 from typing import Tuple, List, Optional
 from dataclasses import dataclass
+from .store import FORCE, POS, PREV_POS, VEL, BodyStore, detached_store, is_detached
+
+DEFAULT_CATEGORY = 0x0001
+ALL_CATEGORIES = 0xFFFFFFFF
 
 @dataclass
 class Constraint:
@@ -13,25 +17,108 @@ class Constraint:
         """Solve constraint."""
         pass
 
+def _field(name: str, cast) -> property:
+    """Property reading and writing one parameter column of the body's store."""
+    def get(self):
+        return cast(getattr(self._store, name)[self._row])
+
+    def set(self, value) -> None:
+        getattr(self._store, name)[self._row] = value
+
+    return property(get, set)
+
+def _vector(index: int) -> property:
+    """Property exposing one row of the body's state block as a view."""
+    def get(self) -> np.ndarray:
+        return self._store.state[self._row, index]
+
+    def set(self, value) -> None:
+        self._store.state[self._row, index] = value
+
+    return property(get, set)
+
 class RigidBody:
+    """Circular body whose data lives in a shared BodyStore row.
+
+    The object itself holds only its store and row; ``pos``, ``prev_pos``,
+    ``vel`` and ``force`` are views into the store's state block and
+    assigning to them copies into it. Bodies start in a detached store and
+    move into their world's store (and dtype) when added.
+    """
+    __slots__ = ('_store', '_row', '_constraints')
+
     def __init__(self,
                  pos: Tuple[float, float],
                  radius: float,
                  mass: float,
                  restitution: float = 0.8,
-                 friction: float = 0.1):
-        self.pos = np.array(pos, dtype=float)
-        self.prev_pos = self.pos.copy()
-        self.vel = np.zeros(2, dtype=float)
-        self.force = np.zeros(2, dtype=float)
+                 friction: float = 0.1,
+                 category: int = DEFAULT_CATEGORY,
+                 mask: int = ALL_CATEGORIES):
+        self._store = detached_store()
+        self._row = self._store.alloc()
+        self._constraints: Optional[List[Constraint]] = None  # Allocated on first use
+        self.pos = pos
+        self.prev_pos = pos
         self.radius = radius
         self.mass = mass
         self.inv_mass = 1.0 / mass if mass > 0 else 0
         self.restitution = restitution
         self.friction = friction
         self.is_static = mass == 0
-        self.constraints: List[Constraint] = []
         self.pinned = False
+        self.category = category  # Bits this body belongs to
+        self.mask = mask  # Bits this body collides with
+
+    pos = _vector(POS)
+    prev_pos = _vector(PREV_POS)
+    vel = _vector(VEL)
+    force = _vector(FORCE)
+    radius = _field('radius', float)
+    mass = _field('mass', float)
+    inv_mass = _field('inv_mass', float)
+    restitution = _field('restitution', float)
+    friction = _field('friction', float)
+    category = _field('category', int)
+    mask = _field('mask', int)
+    is_static = _field('is_static', bool)
+    pinned = _field('pinned', bool)
+
+    def __del__(self) -> None:
+        store = getattr(self, '_store', None)
+        if store is not None:
+            store.free(self._row)
+
+    @property
+    def constraints(self) -> List[Constraint]:
+        if self._constraints is None:
+            self._constraints = []
+        return self._constraints
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._store.dtype
+
+    def move_to(self, store: BodyStore) -> None:
+        """Move this body's row into ``store``."""
+        if store is self._store:
+            return
+        old_store, old_row = self._store, self._row
+        row = store.alloc()
+        store.copy_row(old_store, old_row, row)
+        self._store, self._row = store, row
+        old_store.free(old_row)
+
+    def set_precision(self, dtype) -> None:
+        """Store this body's state in ``dtype`` (float64 or float32).
+
+        Bodies in a world use the world's precision and can't be changed.
+        """
+        if self._store.dtype == dtype:
+            return
+        if not is_detached(self._store):
+            raise ValueError("body belongs to a world; its precision is the world's")
+        self.move_to(detached_store(dtype))
 
     def apply_force(self, force: np.ndarray) -> None:
         """Apply force to body."""
@@ -44,18 +131,21 @@ class RigidBody:
 
     def integrate(self, dt: float) -> None:
         """Integrate physics using Verlet."""
-        if self.is_static or self.pinned:
+        store, row = self._store, self._row
+        if store.is_static[row] or store.pinned[row]:
             return
 
-        self.prev_pos = self.pos.copy()
-        self.vel += self.force * self.inv_mass * dt
-        self.vel *= (1.0 - self.friction)
-        self.pos += self.vel * dt + 0.5 * self.force * self.inv_mass * dt * dt
-        self.force = np.zeros(2, dtype=float)
+        pos, prev_pos, vel, force = store.state[row]
+        inv_mass = float(store.inv_mass[row])
+        prev_pos[:] = pos
+        vel += force * inv_mass * dt
+        vel *= (1.0 - float(store.friction[row]))
+        pos += vel * dt + 0.5 * force * inv_mass * dt * dt
+        force.fill(0.0)
 
     def solve_constraints(self, dt: float) -> None:
         """Solve all constraints."""
-        for constraint in self.constraints:
+        for constraint in self._constraints or ():
             for _ in range(constraint.iterations):
                 constraint.solve(dt)
 
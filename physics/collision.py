@@ -5,6 +5,7 @@ from .body import RigidBody
 
 @dataclass
 class CollisionInfo:
+    __slots__ = ('normal', 'penetration', 'contact_point', 'body_a', 'body_b')
     normal: np.ndarray
     penetration: float
     contact_point: np.ndarray
@@ -31,17 +32,30 @@ def circle_vs_line(body: RigidBody, p1: np.ndarray, p2: np.ndarray) -> Optional[
     line_vec = p2 - p1
     line_len = np.linalg.norm(line_vec)
     line_dir = line_vec / line_len
+    line_normal = np.array([-line_dir[1], line_dir[0]])
+    return circle_vs_segment(body, p1, line_dir, line_normal, line_len)
+
+def circle_vs_segment(body: RigidBody, p1: np.ndarray, line_dir: np.ndarray,
+                      line_normal: np.ndarray, line_len: float) -> Optional[CollisionInfo]:
+    """Detect circle-line collision against a precomputed segment."""
     to_circle = body.pos - p1
     proj = np.dot(to_circle, line_dir)
-    proj = np.clip(proj, 0, line_len)
-    closest = p1 + line_dir * proj
-    to_closest = body.pos - closest
-    dist = np.linalg.norm(to_closest)
-    
-    if dist > body.radius:
-        return None
+    if 0.0 < proj < line_len:
+        # Closest point is inside the segment: the distance is just the
+        # offset along the precomputed normal.
+        offset = float(np.dot(to_circle, line_normal))
+        dist = abs(offset)
+        if dist > body.radius:
+            return None
+        normal = line_normal if offset >= 0 else -line_normal
+    else:
+        closest = p1 if proj <= 0.0 else p1 + line_dir * line_len
+        to_closest = body.pos - closest
+        dist = np.linalg.norm(to_closest)
+        if dist > body.radius:
+            return None
+        normal = to_closest / dist if dist > 0 else np.array([0.0, 1.0])
     
-    normal = to_closest / dist if dist > 0 else np.array([0.0, 1.0])
     penetration = body.radius - dist
     contact_point = body.pos - normal * body.radius
     
@@ -0,0 +1,205 @@
+import numpy as np
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+from .body import RigidBody
+from .collision import CollisionInfo
+from .store import POS, VEL
+
+class Contact:
+    """Persistent contact between a body and another body or static geometry.
+
+    The normal points from ``body_a`` to ``body_b``; static geometry is
+    always stored as ``body_a = None``.
+    """
+    __slots__ = ('key', 'body_a', 'body_b', 'normal', 'point', 'penetration',
+                 'mass_normal', 'bias', 'normal_impulse', 'persisted')
+
+    def __init__(self, key: Hashable, body_a: Optional[RigidBody], body_b: RigidBody):
+        self.key = key
+        self.body_a = body_a
+        self.body_b = body_b
+        self.normal = np.zeros(2, dtype=float)
+        self.point = np.zeros(2, dtype=float)
+        self.penetration = 0.0
+        self.mass_normal = 0.0
+        self.bias = 0.0
+        self.normal_impulse = 0.0  # Accumulated over iterations, reused next step
+        self.persisted = False
+
+def gather_bodies(contacts: Sequence[Contact]):
+    """Store rows of the bodies in ``contacts`` and each contact's local body indices.
+
+    Returns ``(store, rows, ia, ib, dynamic)``: ``ia``/``ib`` index the
+    unique ``rows``, with index ``len(rows)`` standing for static geometry,
+    and ``dynamic`` (one longer than ``rows``) flags bodies that can move.
+    All bodies must share one store, as they do within a world.
+    """
+    n = len(contacts)
+    store = contacts[0].body_b._store
+    rows_a = np.fromiter((-1 if c.body_a is None else c.body_a._row for c in contacts),
+                         dtype=np.intp, count=n)
+    rows_b = np.fromiter((c.body_b._row for c in contacts), dtype=np.intp, count=n)
+    rows, local = np.unique(np.concatenate((rows_a, rows_b)), return_inverse=True)
+    local = local.reshape(-1)
+    if rows[0] == -1:
+        rows = rows[1:]
+        local = np.where(local == 0, len(rows), local - 1)
+    dynamic = np.zeros(len(rows) + 1, dtype=bool)
+    dynamic[:-1] = ~store.is_static[rows]
+    return store, rows, local[:n], local[n:], dynamic
+
+def colour_pairs(ia: np.ndarray, ib: np.ndarray, dynamic: np.ndarray) -> List[np.ndarray]:
+    """Greedy colouring of (a, b) pairs, in order, so a colour never repeats a dynamic body.
+
+    Returns the pair indices of each colour, in colour order.
+    """
+    used = [0] * len(dynamic)  # Bitmask of colours touching each local body
+    moves = dynamic.tolist()
+    colours = []
+    for a, b in zip(ia.tolist(), ib.tolist()):
+        taken = (used[a] if moves[a] else 0) | (used[b] if moves[b] else 0)
+        colour = (~taken & (taken + 1)).bit_length() - 1
+        bit = 1 << colour
+        if moves[a]:
+            used[a] |= bit
+        if moves[b]:
+            used[b] |= bit
+        colours.append(colour)
+    colours = np.array(colours)
+    order = np.argsort(colours, kind='stable')
+    return np.split(order, np.flatnonzero(np.diff(colours[order])) + 1)
+
+class ContactManager:
+    """Sequential-impulse contact solver with a contact cache keyed by pair.
+
+    Contacts that survive from one substep to the next start from the
+    impulse they ended with (warm starting), so stacked clusters such as a
+    frozen rack settle in a few iterations instead of jittering.
+    """
+    def __init__(self,
+                 iterations: int = 4,
+                 correction: float = 0.2,
+                 slop: float = 0.01,
+                 restitution_threshold: float = 1.0,
+                 warm_start: bool = True):
+        self.iterations = iterations
+        self.correction = correction  # Fraction of penetration removed per substep
+        self.slop = slop  # Penetration allowed before correcting position
+        self.restitution_threshold = restitution_threshold  # Slower approaches don't bounce
+        self.warm_start = warm_start
+        self.contacts: List[Contact] = []
+        self._cache: Dict[Hashable, Contact] = {}
+
+    def clear(self) -> None:
+        """Forget all cached contacts."""
+        self.contacts = []
+        self._cache = {}
+
+    def update(self, collisions: List[Tuple[Hashable, CollisionInfo]]) -> List[Contact]:
+        """Turn this substep's collisions into contacts, reusing cached ones."""
+        cache: Dict[Hashable, Contact] = {}
+        contacts = []
+        for key, info in collisions:
+            if info.body_b is None:
+                # Static geometry: flip so the normal points from line to body.
+                body_a, body_b = None, info.body_a
+            else:
+                body_a, body_b = info.body_a, info.body_b
+
+            contact = self._cache.get(key)
+            if contact is None:
+                contact = Contact(key, body_a, body_b)
+            else:
+                contact.persisted = True
+                if not self.warm_start:
+                    contact.normal_impulse = 0.0
+            contact.normal[:] = info.normal
+            contact.point[:] = info.contact_point
+            contact.penetration = info.penetration
+            cache[key] = contact
+            contacts.append(contact)
+
+        self._cache = cache
+        self.contacts = contacts
+        return contacts
+
+    def solve(self, contacts: Optional[List[Contact]] = None) -> None:
+        """Prepare, warm start and iterate over the given contacts.
+
+        Works on arrays gathered from the body store. Contacts are
+        greedily coloured in order so that no two of one colour share a
+        dynamic body; each colour is then one vectorized impulse update,
+        which is Gauss-Seidel between colours and exact within them. An
+        island's colouring doesn't depend on which other islands are
+        solved alongside it, so any batching of islands gives identical
+        results.
+        """
+        if contacts is None:
+            contacts = self.contacts
+        n = len(contacts)
+        if n == 0:
+            return
+        store, rows, ia, ib, dynamic = gather_bodies(contacts)
+        normal = np.array([c.normal for c in contacts])
+        penetration = np.fromiter((c.penetration for c in contacts), dtype=float, count=n)
+        accumulated = np.fromiter((c.normal_impulse if c.persisted else 0.0 for c in contacts),
+                                  dtype=float, count=n)
+
+        # Local copies of the bodies; the extra last row stands for static geometry.
+        m = len(rows)
+        inv_mass = np.zeros(m + 1)
+        inv_mass[:m] = np.where(dynamic[:m], store.inv_mass[rows], 0.0)
+        restitution = np.full(m + 1, np.inf)
+        restitution[:m] = store.restitution[rows]
+        vel = np.zeros((m + 1, 2))
+        vel[:m] = store.state[rows, VEL]
+        pos = np.zeros((m + 1, 2))
+        pos[:m] = store.state[rows, POS]
+        inv_a, inv_b = inv_mass[ia], inv_mass[ib]
+        # Interleave a/b so np.add.at applies updates in sequential order
+        both = np.empty(2 * n, dtype=np.intp)
+        both[0::2], both[1::2] = ia, ib
+
+        inv_sum = inv_a + inv_b
+        mass_normal = np.divide(1.0, inv_sum, out=np.zeros(n), where=inv_sum > 0)
+        vn = ((vel[ib] - vel[ia]) * normal).sum(axis=1)
+        bias = np.where(vn < -self.restitution_threshold,
+                        -np.minimum(restitution[ia], restitution[ib]) * vn, 0.0)
+
+        accumulated[accumulated < 0] = 0.0
+        if accumulated.any():
+            impulse = normal * accumulated[:, None]
+            np.add.at(vel, both, self._pair_deltas(impulse, inv_a, inv_b))
+
+        colours = [(idx, ia[idx], ib[idx], normal[idx]) for idx in colour_pairs(ia, ib, dynamic)]
+        for _ in range(self.iterations):
+            for idx, a, b, nrm in colours:
+                vn = ((vel[b] - vel[a]) * nrm).sum(axis=1)
+                total = np.maximum(accumulated[idx] + mass_normal[idx] * (bias[idx] - vn), 0.0)
+                # Clamp the accumulated impulse, not the increment, so later
+                # iterations can take back what earlier ones overshot.
+                impulse = nrm * (total - accumulated[idx])[:, None]
+                accumulated[idx] = total
+                vel[a] -= impulse * inv_a[idx, None]
+                vel[b] += impulse * inv_b[idx, None]
+
+        depth = penetration - self.slop
+        correcting = (depth > 0) & (mass_normal != 0.0)
+        if correcting.any():
+            correction = normal * np.where(correcting, depth * self.correction * mass_normal, 0.0)[:, None]
+            np.add.at(pos, both, self._pair_deltas(correction, inv_a, inv_b))
+
+        moving = dynamic[:m]
+        store.state[rows[moving], VEL] = vel[:m][moving]
+        store.state[rows[moving], POS] = pos[:m][moving]
+        for c, impulse, mn, b in zip(contacts, accumulated.tolist(), mass_normal.tolist(), bias.tolist()):
+            c.normal_impulse = impulse
+            c.mass_normal = mn
+            c.bias = b
+
+    @staticmethod
+    def _pair_deltas(impulse: np.ndarray, inv_a: np.ndarray, inv_b: np.ndarray) -> np.ndarray:
+        """Per-body changes for np.add.at over interleaved (a, b) indices."""
+        deltas = np.empty((2 * len(impulse), 2))
+        deltas[0::2] = -impulse * inv_a[:, None]
+        deltas[1::2] = impulse * inv_b[:, None]
+        return deltas
@@ -0,0 +1,176 @@
+import numpy as np
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Type
+from .body import RigidBody
+from .contacts import Contact
+
+BEGIN = 0
+PERSIST = 1
+END = 2
+
+class ContactEvents:
+    """One step's contact events as parallel arrays.
+
+    ``body_a``/``body_b`` index into ``bodies`` (-1 means static geometry),
+    ``impulse`` is the total normal impulse over the step's substeps and
+    ``point`` the last contact point. END events repeat the impulse and
+    point from the pair's last step in contact.
+
+    The arrays are views into the collector's buffers and are overwritten
+    on the next step; copy anything that must outlive the callback.
+    """
+    __slots__ = ('kind', 'body_a', 'body_b', 'impulse', 'point', 'bodies')
+
+    def __init__(self, kind: np.ndarray, body_a: np.ndarray, body_b: np.ndarray,
+                 impulse: np.ndarray, point: np.ndarray, bodies: List[RigidBody]):
+        self.kind = kind
+        self.body_a = body_a
+        self.body_b = body_b
+        self.impulse = impulse
+        self.point = point
+        self.bodies = bodies
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def pair(self, i: int) -> Tuple[Optional[RigidBody], Optional[RigidBody]]:
+        """Bodies of event ``i``; None stands for static geometry."""
+        a, b = self.body_a[i], self.body_b[i]
+        return (self.bodies[a] if a >= 0 else None,
+                self.bodies[b] if b >= 0 else None)
+
+    def select(self, mask: np.ndarray) -> "ContactEvents":
+        return ContactEvents(self.kind[mask], self.body_a[mask], self.body_b[mask],
+                             self.impulse[mask], self.point[mask], self.bodies)
+
+class ContactListener:
+    """Batched callback plus the filters applied before it is called."""
+    __slots__ = ('callback', 'body_types', 'min_impulse')
+
+    def __init__(self, callback: Callable[[ContactEvents], None],
+                 body_types: Optional[Tuple[Type, ...]] = None,
+                 min_impulse: float = 0.0):
+        self.callback = callback
+        self.body_types = body_types
+        self.min_impulse = min_impulse
+
+class ContactEventCollector:
+    """Accumulates contacts over a step and turns them into events.
+
+    Storage is preallocated and only grows (by doubling), so a steady
+    scene allocates nothing per step beyond the listeners' filtered views.
+    """
+    def __init__(self, capacity: int = 64):
+        self.listeners: List[ContactListener] = []
+        self.count = 0
+        self._allocate(capacity)
+        self._slots: Dict[Hashable, int] = {}
+        self._pairs: List[Tuple[Optional[RigidBody], RigidBody]] = []
+        # Pairs in contact last step: key -> (body_a, body_b, impulse, point)
+        self._previous: Dict[Hashable, tuple] = {}
+
+    def _allocate(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.body_a = np.zeros(capacity, dtype=np.int32)
+        self.body_b = np.zeros(capacity, dtype=np.int32)
+        self.impulse = np.zeros(capacity, dtype=float)
+        self.point = np.zeros((capacity, 2), dtype=float)
+
+    def _reserve(self, count: int) -> None:
+        if count <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < count:
+            capacity *= 2
+        old = (self.kind, self.body_a, self.body_b, self.impulse, self.point)
+        self._allocate(capacity)
+        for new, data in zip((self.kind, self.body_a, self.body_b, self.impulse, self.point), old):
+            new[:len(data)] = data
+
+    @property
+    def active(self) -> bool:
+        return bool(self.listeners)
+
+    def begin_step(self) -> None:
+        self.count = 0
+        self._slots.clear()
+        self._pairs.clear()
+
+    def add(self, contacts: Sequence[Contact]) -> None:
+        """Fold one substep's solved contacts into this step's events."""
+        for c in contacts:
+            slot = self._slots.get(c.key)
+            if slot is None:
+                slot = self.count
+                self._reserve(slot + 1)
+                self._slots[c.key] = slot
+                self._pairs.append((c.body_a, c.body_b))
+                self.kind[slot] = PERSIST if c.key in self._previous else BEGIN
+                self.impulse[slot] = 0.0
+                self.count += 1
+            self.impulse[slot] += c.normal_impulse
+            self.point[slot] = c.point
+
+    def end_step(self) -> None:
+        """Add END events, build the batch and hand it to the listeners."""
+        current = {}
+        for key, slot in self._slots.items():
+            body_a, body_b = self._pairs[slot]
+            current[key] = (body_a, body_b, self.impulse[slot], self.point[slot].copy())
+        for key, (body_a, body_b, impulse, point) in self._previous.items():
+            if key in current:
+                continue
+            slot = self.count
+            self._reserve(slot + 1)
+            self._pairs.append((body_a, body_b))
+            self.kind[slot] = END
+            self.impulse[slot] = impulse
+            self.point[slot] = point
+            self.count += 1
+        self._previous = current
+
+        if self.count == 0:
+            return
+        bodies: List[RigidBody] = []
+        index: Dict[int, int] = {}
+        for slot, (body_a, body_b) in enumerate(self._pairs):
+            self.body_a[slot] = self._index(body_a, bodies, index)
+            self.body_b[slot] = self._index(body_b, bodies, index)
+
+        n = self.count
+        events = ContactEvents(self.kind[:n], self.body_a[:n], self.body_b[:n],
+                               self.impulse[:n], self.point[:n], bodies)
+        for listener in self.listeners:
+            self._deliver(listener, events)
+
+    def reset(self) -> None:
+        """Forget contacts carried over from the previous step."""
+        self._previous = {}
+        self.begin_step()
+
+    @staticmethod
+    def _index(body: Optional[RigidBody], bodies: List[RigidBody], index: Dict[int, int]) -> int:
+        if body is None:
+            return -1
+        i = index.get(id(body))
+        if i is None:
+            i = index[id(body)] = len(bodies)
+            bodies.append(body)
+        return i
+
+    @staticmethod
+    def _deliver(listener: ContactListener, events: ContactEvents) -> None:
+        mask = None
+        if listener.min_impulse > 0:
+            # END always passes, so every delivered BEGIN gets its END
+            mask = (events.impulse >= listener.min_impulse) | (events.kind == END)
+        if listener.body_types is not None:
+            matches = np.array([isinstance(body, listener.body_types) for body in events.bodies]
+                               + [False])
+            # Index -1 (static geometry) lands on the trailing False
+            typed = matches[events.body_a] | matches[events.body_b]
+            mask = typed if mask is None else mask & typed
+        if mask is None:
+            listener.callback(events)
+        elif mask.any():
+            listener.callback(events.select(mask))
@@ -0,0 +1,73 @@
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+class StaticGeometry:
+    """Static segments compiled into flat arrays plus a uniform grid.
+
+    Directions, normals and lengths are computed once at compile time, and
+    each grid cell lists the segments passing through it, so a body only
+    tests the segments near it no matter how detailed the rails are.
+    """
+    def __init__(self, segments: Sequence[Tuple[np.ndarray, np.ndarray]] = (),
+                 cell_size: float = 64.0):
+        self.cell_size = float(cell_size)
+        count = len(segments)
+        self.starts = np.zeros((count, 2), dtype=float)
+        self.ends = np.zeros((count, 2), dtype=float)
+        for i, (p1, p2) in enumerate(segments):
+            self.starts[i] = p1
+            self.ends[i] = p2
+
+        delta = self.ends - self.starts
+        self.lengths = np.linalg.norm(delta, axis=1)
+        safe = np.where(self.lengths > 0, self.lengths, 1.0)
+        self.directions = delta / safe[:, None]
+        # Left-hand normal; which side is "inside" depends on winding.
+        self.normals = np.stack([-self.directions[:, 1], self.directions[:, 0]], axis=1)
+        self.cells: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        self._build_grid()
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def _build_grid(self) -> None:
+        """Bin every segment into the cells it actually crosses."""
+        size = self.cell_size
+        half_diag = size * np.sqrt(0.5)
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for i in range(len(self)):
+            p1, p2 = self.starts[i], self.ends[i]
+            lo = np.floor(np.minimum(p1, p2) / size).astype(int)
+            hi = np.floor(np.maximum(p1, p2) / size).astype(int)
+            xs, ys = np.meshgrid(np.arange(lo[0], hi[0] + 1), np.arange(lo[1], hi[1] + 1))
+            xs, ys = xs.ravel(), ys.ravel()
+            centers = (np.stack([xs, ys], axis=1) + 0.5) * size
+            proj = np.clip((centers - p1) @ self.directions[i], 0, self.lengths[i])
+            closest = p1 + proj[:, None] * self.directions[i]
+            near = np.linalg.norm(centers - closest, axis=1) <= half_diag
+            for x, y in zip(xs[near], ys[near]):
+                cells.setdefault((int(x), int(y)), []).append(i)
+        self.cells = {key: tuple(ids) for key, ids in cells.items()}
+
+    def query(self, pos: np.ndarray, radius: float) -> Sequence[int]:
+        """Indices of segments whose cells overlap the circle's bounding box."""
+        size = self.cell_size
+        x0 = int((pos[0] - radius) // size)
+        x1 = int((pos[0] + radius) // size)
+        y0 = int((pos[1] - radius) // size)
+        y1 = int((pos[1] + radius) // size)
+        if x0 == x1 and y0 == y1:
+            return self.cells.get((x0, y0), ())
+        found = set()
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                found.update(self.cells.get((x, y), ()))
+        return sorted(found)
+
+def arc_segments(center: Tuple[float, float], radius: float,
+                 start_angle: float, end_angle: float,
+                 segments: int = 8) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
+    """Approximate a circular arc by a chain of line segments."""
+    angles = np.linspace(start_angle, end_angle, segments + 1)
+    points = [(center[0] + radius * np.cos(a), center[1] + radius * np.sin(a)) for a in angles]
+    return list(zip(points[:-1], points[1:]))
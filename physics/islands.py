@@ -0,0 +1,51 @@
+import numpy as np
+from typing import Callable, List, Sequence
+from .contacts import Contact, gather_bodies
+
+def build_islands(contacts: Sequence[Contact]) -> List[List[Contact]]:
+    """Split contacts into groups that share no dynamic body.
+
+    Static bodies and static geometry never move, so they don't join
+    islands together. Islands come out ordered by their first contact and
+    keep the original contact order, which keeps results deterministic.
+    """
+    n = len(contacts)
+    if n == 0:
+        return []
+    _, _, ia, ib, dynamic = gather_bodies(contacts)
+
+    # Label propagation with pointer jumping: every dynamic body ends up
+    # labelled with the lowest index in its connected component.
+    label = np.arange(len(dynamic))
+    linked = dynamic[ia] & dynamic[ib]
+    a, b = ia[linked], ib[linked]
+    while True:
+        new = label.copy()
+        np.minimum.at(new, a, label[b])
+        np.minimum.at(new, b, label[a])
+        new = new[new]
+        if np.array_equal(new, label):
+            break
+        label = new
+
+    # Contacts touching no dynamic body form islands of their own
+    key = np.where(dynamic[ib], label[ib], np.where(dynamic[ia], label[ia], -1 - np.arange(n)))
+    _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.intp)
+    rank[np.argsort(first, kind='stable')] = np.arange(len(first))
+    island = rank[inverse.reshape(-1)]
+    order = np.argsort(island, kind='stable')
+    bounds = np.flatnonzero(np.diff(island[order])) + 1
+    return [[contacts[i] for i in group] for group in np.split(order, bounds)]
+
+def balance(groups: Sequence, workers: int, weight: Callable = len) -> List[List]:
+    """Deal groups into at most ``workers`` batches of similar total weight."""
+    batches: List[List] = [[] for _ in range(min(workers, len(groups)))]
+    loads = [0] * len(batches)
+    weights = [weight(group) for group in groups]
+    order = sorted(range(len(groups)), key=lambda i: (-weights[i], i))
+    for i in order:
+        target = loads.index(min(loads))
+        batches[target].append(groups[i])
+        loads[target] += weights[i]
+    return batches
@@ -5,6 +5,8 @@ from .body import RigidBody
 
 class Particle(RigidBody):
     """Particle with lifetime and visual properties."""
+    __slots__ = ('color', 'lifetime', 'age', 'alpha')
+
     def __init__(self,
                  pos: Tuple[float, float],
                  vel: Tuple[float, float],
@@ -123,9 +125,10 @@ class ConfettiEmitter(PointEmitter):
 
 class ParticleSystem:
     """Particle system manager."""
-    def __init__(self):
+    def __init__(self, dtype=float):
         self.emitters: List[ParticleEmitter] = []
         self.particles: List[Particle] = []
+        self.dtype = np.dtype(dtype)
 
     def add_emitter(self, emitter: ParticleEmitter) -> None:
         """Add emitter."""
@@ -137,6 +140,8 @@ class ParticleSystem:
 
         for emitter in self.emitters:
             new_particles = emitter.emit(dt)
+            for particle in new_particles:
+                particle.set_precision(self.dtype)
             self.particles.extend(new_particles)
 
         for particle in self.particles:
@@ -0,0 +1,265 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from .body import RigidBody
+
+META_FILE = "meta.json"
+POSITIONS_FILE = "positions.bin"
+VELOCITIES_FILE = "velocities.bin"
+CONTACTS_FILE = "contacts.bin"
+
+def contact_dtype(dtype) -> np.dtype:
+    """Record layout of a single contact event."""
+    return np.dtype([
+        ("frame", np.int64),
+        ("body_a", np.int32),
+        ("body_b", np.int32),
+        ("point", dtype, (2,)),
+        ("normal", dtype, (2,)),
+        ("penetration", dtype),
+    ])
+
+class TrajectoryRecorder:
+    """Streams per-step body states and contacts to columnar files on disk.
+
+    Frames are gathered into preallocated chunks which a background thread
+    appends to one raw file per column, so the step loop never waits on disk.
+    Bodies that leave the world (e.g. pocketed balls) are written as NaN, and
+    contacts are only kept for the steps that are actually recorded.
+    The metadata header is written up front and refreshed after every
+    flushed chunk, so a recording stays readable while running or after a
+    crash; an exit hook flushes anything still queued if close() is skipped.
+    """
+    def __init__(self,
+                 path: str,
+                 bodies: Sequence[RigidBody],
+                 stride: int = 1,
+                 chunk_frames: int = 256,
+                 max_pending: int = 4,
+                 dtype=np.float32,
+                 dt: Optional[float] = None):
+        if stride < 1:
+            raise ValueError("stride must be at least 1")
+        if chunk_frames < 1:
+            raise ValueError("chunk_frames must be at least 1")
+        self.path = path
+        self.bodies: List[RigidBody] = list(bodies)
+        self.stride = stride
+        self.chunk_frames = chunk_frames
+        self.dtype = np.dtype(dtype)
+        self.frames = 0
+        self.steps = 0
+        self.dt = dt
+        self._written = 0  # Frames the writer thread has put on disk
+        self._index = {id(body): i for i, body in enumerate(self.bodies)}
+        # Taken once here: the writer thread must not read live bodies
+        self._labels = [getattr(body, "number", i) for i, body in enumerate(self.bodies)]
+        self._radii = [float(body.radius) for body in self.bodies]
+        self._contact_dtype = contact_dtype(self.dtype)
+        self._contacts: List[tuple] = []
+        self._fill = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+        os.makedirs(path, exist_ok=True)
+        self._files = [open(os.path.join(path, name), "wb")
+                       for name in (POSITIONS_FILE, VELOCITIES_FILE, CONTACTS_FILE)]
+        self._write_meta()
+
+        # Double-buffered chunks: the step loop fills one while the writer
+        # thread flushes the others. Blocking on the free pool is the only
+        # back-pressure, and only happens if the disk falls max_pending behind.
+        shape = (chunk_frames, len(self.bodies), 2)
+        self._free: "queue.Queue" = queue.Queue()
+        for _ in range(max(2, max_pending)):
+            self._free.put((np.empty(shape, self.dtype), np.empty(shape, self.dtype)))
+        self._pending: "queue.Queue" = queue.Queue()
+        self._chunk = self._free.get()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        # The writer is a daemon so it can't hang shutdown; flush it at exit instead.
+        atexit.register(self.close)
+
+    def record(self, world) -> None:
+        """Record the world state after a step, honouring the stride."""
+        if self._closed:
+            return
+        self.steps += 1
+        if self.dt is None:
+            self.dt = world.dt
+        if (self.steps - 1) % self.stride:
+            return
+
+        positions, velocities = self._chunk
+        row_pos = positions[self._fill]
+        row_vel = velocities[self._fill]
+        alive = {id(body) for body in world.bodies}
+        for i, body in enumerate(self.bodies):
+            if id(body) in alive:
+                row_pos[i] = body.pos
+                row_vel[i] = body.vel
+            else:
+                row_pos[i] = np.nan
+                row_vel[i] = np.nan
+
+        for info in world.contacts:
+            a = self._index.get(id(info.body_a), -1)
+            b = self._index.get(id(info.body_b), -1) if info.body_b is not None else -1
+            if a < 0 and b < 0:
+                continue
+            self._contacts.append((self.frames, a, b, info.contact_point,
+                                   info.normal, info.penetration))
+
+        self._fill += 1
+        self.frames += 1
+        if self._fill == self.chunk_frames:
+            self._submit()
+
+    def flush(self) -> None:
+        """Hand the partially filled chunk to the writer and wait for it."""
+        if self._fill or self._contacts:
+            self._submit()
+        self._pending.join()
+        self._raise_writer_error()
+
+    def close(self) -> None:
+        """Flush remaining frames, stop the writer and write metadata."""
+        if self._closed:
+            return
+        atexit.unregister(self.close)
+        self.flush()
+        self._closed = True
+        self._pending.put(None)
+        self._writer.join()
+        for f in self._files:
+            f.close()
+        self._write_meta()
+        self._raise_writer_error()
+
+    def __enter__(self) -> "TrajectoryRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _submit(self) -> None:
+        contacts = np.array(self._contacts, dtype=self._contact_dtype)
+        self._pending.put((self._chunk, self._fill, contacts))
+        self._contacts = []
+        self._fill = 0
+        self._chunk = self._free.get()
+        self._raise_writer_error()
+
+    def _write_loop(self) -> None:
+        positions_file, velocities_file, contacts_file = self._files
+        while True:
+            item = self._pending.get()
+            if item is None:
+                self._pending.task_done()
+                return
+            chunk, fill, contacts = item
+            try:
+                if self._error is None:
+                    positions, velocities = chunk
+                    positions_file.write(positions[:fill].tobytes())
+                    velocities_file.write(velocities[:fill].tobytes())
+                    contacts_file.write(contacts.tobytes())
+                    for f in self._files:
+                        f.flush()
+                    self._written += fill
+                    self._write_meta()
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._free.put(chunk)
+                self._pending.task_done()
+
+    def _raise_writer_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("trajectory writer failed") from self._error
+
+    def _write_meta(self) -> None:
+        """Atomically replace the header with the frames written so far."""
+        meta = {
+            "frames": self._written,
+            "bodies": len(self.bodies),
+            "labels": self._labels,
+            "radii": self._radii,
+            "stride": self.stride,
+            "dt": self.dt,
+            "dtype": self.dtype.str,
+        }
+        target = os.path.join(self.path, META_FILE)
+        with open(target + ".tmp", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(target + ".tmp", target)
+
+class TrajectoryReader:
+    """Memory-mapped access to a recording made by TrajectoryRecorder.
+
+    The frame count comes from the data files themselves, so recordings that
+    are still being written, or were never closed, can be read up to their
+    last complete frame.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.num_bodies: int = self.meta["bodies"]
+        self.labels: List = self.meta["labels"]
+        self.stride: int = self.meta["stride"]
+        self.dt: Optional[float] = self.meta["dt"]
+        self.dtype = np.dtype(self.meta["dtype"])
+
+        frame_bytes = self.num_bodies * 2 * self.dtype.itemsize
+        sizes = [os.path.getsize(os.path.join(path, name))
+                 for name in (POSITIONS_FILE, VELOCITIES_FILE)]
+        self.frames: int = min(sizes) // frame_bytes if frame_bytes else 0
+
+        shape = (self.frames, self.num_bodies, 2)
+        self._positions = self._map(POSITIONS_FILE, self.dtype, shape)
+        self._velocities = self._map(VELOCITIES_FILE, self.dtype, shape)
+        contacts_dtype = contact_dtype(self.dtype)
+        size = os.path.getsize(os.path.join(path, CONTACTS_FILE))
+        contacts = self._map(CONTACTS_FILE, contacts_dtype, (size // contacts_dtype.itemsize,))
+        end = np.searchsorted(contacts["frame"], self.frames, side="left")
+        self._contacts = contacts[:end]
+
+    def _map(self, name: str, dtype, shape: Tuple[int, ...]) -> np.ndarray:
+        if 0 in shape:
+            return np.empty(shape, dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype,
+                         mode="r", shape=shape)
+
+    def positions(self, start: int = 0, stop: Optional[int] = None, bodies=None) -> np.ndarray:
+        """Positions for frames [start, stop), shape (frames, bodies, 2).
+
+        A slice (or None) for ``bodies`` returns a view into the mapped file;
+        a list of indices has to copy.
+        """
+        return self._select(self._positions, start, stop, bodies)
+
+    def velocities(self, start: int = 0, stop: Optional[int] = None, bodies=None) -> np.ndarray:
+        """Velocities for frames [start, stop), shape (frames, bodies, 2)."""
+        return self._select(self._velocities, start, stop, bodies)
+
+    def contacts(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Contact records whose frame lies in [start, stop), as a view."""
+        frames = self._contacts["frame"]
+        lo = np.searchsorted(frames, start, side="left")
+        hi = len(frames) if stop is None else np.searchsorted(frames, stop, side="left")
+        return self._contacts[lo:hi]
+
+    def time(self, frame: int) -> float:
+        """Simulation time of a recorded frame."""
+        return frame * self.stride * (self.dt or 0.0)
+
+    def _select(self, data: np.ndarray, start: int, stop: Optional[int], bodies) -> np.ndarray:
+        view = data[start:stop]
+        if bodies is None:
+            return view
+        return view[:, bodies]
@@ -0,0 +1,92 @@
+import numpy as np
+from typing import Dict, List
+
+# Rows of the per-body state block
+POS, PREV_POS, VEL, FORCE = range(4)
+
+class BodyStore:
+    """Struct-of-arrays storage for body state and parameters.
+
+    Every body owns one row: a (4, 2) state block (pos, prev_pos, vel,
+    force) plus its scalar parameters and flags. Freed rows are reused and
+    the arrays grow by doubling, so bodies keep only a reference to their
+    store and a row number.
+    """
+    def __init__(self, dtype=float, capacity: int = 16):
+        self.dtype = np.dtype(dtype)
+        self.initial_capacity = capacity
+        self.capacity = 0
+        self.count = 0  # High-water mark of rows ever handed out
+        self.generation = 0  # Bumped whenever a row is handed out or freed
+        self._free: List[int] = []
+        self.state = np.zeros((0, 4, 2), dtype=self.dtype)
+        self.radius = np.zeros(0, dtype=self.dtype)
+        self.mass = np.zeros(0, dtype=self.dtype)
+        self.inv_mass = np.zeros(0, dtype=self.dtype)
+        self.restitution = np.zeros(0, dtype=self.dtype)
+        self.friction = np.zeros(0, dtype=self.dtype)
+        self.category = np.zeros(0, dtype=np.uint32)
+        self.mask = np.zeros(0, dtype=np.uint32)
+        self.is_static = np.zeros(0, dtype=bool)
+        self.pinned = np.zeros(0, dtype=bool)
+        self._grow(capacity)
+
+    _FIELDS = ('state', 'radius', 'mass', 'inv_mass', 'restitution', 'friction',
+               'category', 'mask', 'is_static', 'pinned')
+
+    def _grow(self, capacity: int) -> None:
+        for name in self._FIELDS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def alloc(self) -> int:
+        """Hand out a zeroed row."""
+        self.generation += 1
+        if self._free:
+            return self._free.pop()
+        if self.count == self.capacity:
+            self._grow(max(16, self.capacity * 2))
+        row = self.count
+        self.count += 1
+        return row
+
+    def free(self, row: int) -> None:
+        """Return a row for reuse; an emptied store shrinks back."""
+        self.generation += 1
+        for name in self._FIELDS:
+            getattr(self, name)[row] = 0
+        self._free.append(row)
+        if len(self._free) == self.count and self.capacity > self.initial_capacity:
+            self.count = 0
+            self._free.clear()
+            for name in self._FIELDS:
+                old = getattr(self, name)
+                setattr(self, name, np.zeros((0,) + old.shape[1:], dtype=old.dtype))
+            self._grow(self.initial_capacity)
+
+    @property
+    def size(self) -> int:
+        """Rows currently in use."""
+        return self.count - len(self._free)
+
+    def copy_row(self, src: "BodyStore", src_row: int, row: int) -> None:
+        """Copy one body's row out of another store (casting dtype)."""
+        for name in self._FIELDS:
+            getattr(self, name)[row] = getattr(src, name)[src_row]
+
+_detached: Dict[np.dtype, BodyStore] = {}
+
+def is_detached(store: BodyStore) -> bool:
+    """Whether ``store`` is a shared detached store rather than a world's."""
+    return _detached.get(store.dtype) is store
+
+def detached_store(dtype=float) -> BodyStore:
+    """Shared store for bodies that don't belong to any world."""
+    dtype = np.dtype(dtype)
+    store = _detached.get(dtype)
+    if store is None:
+        store = _detached[dtype] = BodyStore(dtype)
+    return store
@@ -1,89 +1,446 @@
+import math
 import numpy as np
 import pygame
-from typing import List, Tuple
-from .body import RigidBody, SoftBody
-from .collision import circle_vs_circle, circle_vs_line, resolve_collision
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from typing import Callable, List, Optional, Set, Tuple, Type
+from .body import DEFAULT_CATEGORY, DistanceConstraint, RigidBody, SoftBody
+from .collision import CollisionInfo, circle_vs_circle, circle_vs_segment
+from .contacts import Contact, ContactManager, colour_pairs
+from .events import ContactEventCollector, ContactEvents, ContactListener
+from .geometry import StaticGeometry, arc_segments
+from .islands import balance, build_islands
 from .particles import ParticleSystem
+from .store import FORCE, POS, VEL, BodyStore, detached_store
 import settings
 
-SUBSTEPS = 4  # Number of sub-steps per frame for robust collision handling
+SUBSTEPS = 4  # Reference sub-step count; friction is tuned against it
+MIN_SUBSTEPS = 1
+MAX_SUBSTEPS = 8
 CUSHION_DAMPING = 1.0  # No extra damping for cushion collisions
+BROADPHASE_BLOCK = 1 << 18  # Pair tests per broad-phase block; bounds temporary memory
+
+def _pair_key(a: RigidBody, b: RigidBody) -> Tuple[int, int]:
+    ia, ib = id(a), id(b)
+    return (ia, ib) if ia < ib else (ib, ia)
+
+@dataclass
+class StepStats:
+    """Instrumentation for the most recent step."""
+    substeps: int = SUBSTEPS
+    max_displacement: float = 0.0  # Fastest body's travel over the whole frame
+    min_radius: float = 0.0
+    max_penetration: float = 0.0  # Deepest contact seen during the step
+    contacts: int = 0
+    islands: int = 0  # Independent contact groups in the last substep
 
 class PhysicsWorld:
-    def __init__(self, gravity: Tuple[float, float] = (0, 0), dt: float = 1/60):
-        self.gravity = np.array(gravity, dtype=float)
+    def __init__(self, gravity: Tuple[float, float] = (0, 0), dt: float = 1/60,
+                 precision: str = 'float64'):
+        if precision not in ('float64', 'float32'):
+            raise ValueError("precision must be 'float64' or 'float32'")
+        self.dtype = np.dtype(precision)  # Storage type for body state
+        self.gravity = np.array(gravity, dtype=self.dtype)
         self.dt = dt
+        self.store = BodyStore(self.dtype)  # State and parameters of every body, one row each
         self.bodies: List[RigidBody] = []
+        self._rows: Optional[np.ndarray] = None  # Store rows of self.bodies, in order
+        self._row_bodies: List[RigidBody] = []  # self.bodies as of the last _rows build
+        self._row_generation = -1  # store.generation as of the last _rows build
         self.soft_bodies: List[SoftBody] = []
-        self.static_lines: List[Tuple[np.ndarray, np.ndarray]] = []
-        self.particle_system = ParticleSystem()
+        self._static_lines: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._static_version = 0  # Bumped by every static line mutator
+        self.static_category = DEFAULT_CATEGORY  # Layer bits of static lines
+        self.ignored_pairs: Set[Tuple[int, int]] = set()  # Body pairs that never collide
+        self.geometry_cell_size = 64.0
+        self._geometry: Optional[StaticGeometry] = None  # Compiled lazily from static_lines
+        self._geometry_version = -1
+        self.particle_system = ParticleSystem(self.dtype)
         self.iterations = 8  # Number of constraint solving iterations
+        self.adaptive_substeps = True  # Otherwise always use SUBSTEPS
+        self.min_substeps = MIN_SUBSTEPS
+        self.max_substeps = MAX_SUBSTEPS
+        self.max_travel = 0.5  # Per-substep travel allowed, as a fraction of the smallest radius
+        self.penetration_tolerance = 0.05  # Fraction of the smallest radius
+        self.stats = StepStats()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._workers = 1  # Threads used to solve independent contact islands and soft bodies
+        self.parallel_threshold = 64  # Fewer contacts than this are solved inline
+        self.contact_manager = ContactManager()  # Persistent sequential-impulse solver
+        self.contact_events = ContactEventCollector()  # Batched begin/persist/end events
+        self.contacts: List[CollisionInfo] = []  # Contacts resolved during the last step
+        self.recorder = None  # Optional TrajectoryRecorder fed after every step
 
     def add_body(self, body: RigidBody) -> None:
-        """Add physics body."""
+        """Add physics body; its state moves into this world's store."""
+        body.move_to(self.store)
         self.bodies.append(body)
+        self._rows = None
 
-    def add_soft_body(self, soft_body: SoftBody) -> None:
-        """Add soft body."""
+    def add_soft_body(self, soft_body: SoftBody, collide_linked: bool = False) -> None:
+        """Add soft body.
+
+        Particles joined by a constraint don't collide with each other
+        unless ``collide_linked`` is set; the constraint already keeps them apart.
+        """
         self.soft_bodies.append(soft_body)
         # Add all particles to the main body list
-        self.bodies.extend(soft_body.particles)
+        for particle in soft_body.particles:
+            self.add_body(particle)
+        if not collide_linked:
+            for constraint in soft_body.constraints:
+                p1, p2 = getattr(constraint, 'p1', None), getattr(constraint, 'p2', None)
+                if p1 is not None and p2 is not None:
+                    self.ignore_pair(p1, p2)
+
+    def ignore_pair(self, a: RigidBody, b: RigidBody) -> None:
+        """Never collide these two bodies with each other."""
+        self.ignored_pairs.add(_pair_key(a, b))
+
+    def unignore_pair(self, a: RigidBody, b: RigidBody) -> None:
+        """Let two bodies collide again."""
+        self.ignored_pairs.discard(_pair_key(a, b))
 
     def add_static_line(self, p1: Tuple[float, float], p2: Tuple[float, float]) -> None:
         """Add static line."""
-        self.static_lines.append((np.array(p1), np.array(p2)))
+        self._static_lines.append((np.array(p1, dtype=float), np.array(p2, dtype=float)))
+        self._static_version += 1
+
+    def add_static_arc(self,
+                       center: Tuple[float, float],
+                       radius: float,
+                       start_angle: float,
+                       end_angle: float,
+                       segments: int = 8) -> None:
+        """Add static arc (e.g. a pocket jaw) as a chain of lines."""
+        for p1, p2 in arc_segments(center, radius, start_angle, end_angle, segments):
+            self.add_static_line(p1, p2)
+
+    def clear_static_lines(self) -> None:
+        """Remove all static lines."""
+        self._static_lines.clear()
+        self._static_version += 1
+
+    @property
+    def static_lines(self) -> Tuple[Tuple[np.ndarray, np.ndarray], ...]:
+        """Static lines (read-only; use add_static_line/clear_static_lines)."""
+        return tuple(self._static_lines)
+
+    @property
+    def static_geometry(self) -> StaticGeometry:
+        """Compiled static geometry, rebuilt after static lines or the cell size change."""
+        if (self._geometry is None or self._geometry_version != self._static_version
+                or self._geometry.cell_size != self.geometry_cell_size):
+            self._geometry = StaticGeometry(self._static_lines, self.geometry_cell_size)
+            self._geometry_version = self._static_version
+        return self._geometry
+
+    def add_contact_listener(self,
+                             callback: Callable[[ContactEvents], None],
+                             body_types: Optional[Tuple[Type, ...]] = None,
+                             min_impulse: float = 0.0) -> ContactListener:
+        """Call ``callback`` once per step with that step's contact events.
+
+        ``body_types`` keeps events where either body is an instance of one
+        of the types; ``min_impulse`` drops lighter BEGIN/PERSIST events
+        (END events always pass).
+        """
+        listener = ContactListener(callback, body_types, min_impulse)
+        self.contact_events.listeners.append(listener)
+        return listener
+
+    def remove_contact_listener(self, listener: ContactListener) -> None:
+        """Remove contact listener."""
+        if listener in self.contact_events.listeners:
+            self.contact_events.listeners.remove(listener)
+        if not self.contact_events.active:
+            self.contact_events.reset()
+
+    def set_recorder(self, recorder) -> None:
+        """Attach (or detach with None) a trajectory recorder."""
+        self.recorder = recorder
+
+    def choose_substeps(self) -> int:
+        """Pick this frame's substep count from speed and last frame's penetration."""
+        stats = self.stats
+        store = self.store
+        rows = self.body_rows()
+        rows = rows[~store.is_static[rows]]
+        max_speed_sq = 0.0
+        min_radius = 0.0
+        if len(rows):
+            vel = store.state[rows, VEL]
+            max_speed_sq = float((vel * vel).sum(axis=1).max())
+            min_radius = float(store.radius[rows].min())
+        stats.max_displacement = math.sqrt(max_speed_sq) * self.dt
+        stats.min_radius = min_radius
+
+        if not self.adaptive_substeps:
+            return SUBSTEPS
+        if min_radius <= 0:
+            return self.max_substeps
+
+        substeps = math.ceil(stats.max_displacement / (self.max_travel * min_radius))
+        if stats.max_penetration > self.penetration_tolerance * min_radius:
+            substeps = max(substeps, stats.substeps * 2)
+        return min(max(substeps, self.min_substeps), self.max_substeps)
 
     def step(self) -> None:
         """Perform physics step."""
-        sub_dt = self.dt / SUBSTEPS
-        for _ in range(SUBSTEPS):
-            # Apply gravity to all bodies
-            for body in self.bodies:
-                if not body.is_static:
-                    body.apply_force(self.gravity * body.mass)
-
-            # Integrate velocities and positions (classic Newtonian)
-            for body in self.bodies:
-                body.vel += body.force * body.inv_mass * sub_dt
-                body.vel *= (1.0 - body.friction)
-                body.pos += body.vel * sub_dt
-                body.force = np.zeros(2, dtype=float)
-                # Clamp position to table bounds
-                left = settings.TABLE_MARGIN + body.radius
-                right = settings.WINDOW_WIDTH - settings.TABLE_MARGIN - body.radius
-                top = settings.TABLE_MARGIN + body.radius
-                bottom = settings.WINDOW_HEIGHT - settings.TABLE_MARGIN - body.radius
-                body.pos[0] = np.clip(body.pos[0], left, right)
-                body.pos[1] = np.clip(body.pos[1], top, bottom)
+        self.contacts.clear()
+        events = self.contact_events.active
+        if events:
+            self.contact_events.begin_step()
+        substeps = self.choose_substeps()
+        self.stats.substeps = substeps
+        self.stats.max_penetration = 0.0
+        sub_dt = self.dt / substeps
+        # Keep per-frame damping the same whatever the substep count
+        friction_exp = SUBSTEPS / substeps
+        for _ in range(substeps):
+            self._integrate(sub_dt, friction_exp)
 
             # Solve soft body constraints (if any)
-            for _ in range(self.iterations):
-                for soft_body in self.soft_bodies:
-                    soft_body.solve_constraints(sub_dt)
+            self._solve_soft_bodies(sub_dt)
+
+            # Detect and resolve collisions (sequential impulses, warm started)
+            contacts = self._resolve_collisions()
+            if events:
+                self.contact_events.add(contacts)
 
-            # Detect and resolve collisions (impulse-based, one pass)
-            self._resolve_collisions()
+        if events:
+            self.contact_events.end_step()
 
         # Update particle system
         self.particle_system.update(self.dt)
 
-    def _resolve_collisions(self) -> None:
-        """Resolve all collisions."""
-        # Check ball-ball collisions
-        for i, body_a in enumerate(self.bodies):
-            for body_b in self.bodies[i+1:]:
-                collision = circle_vs_circle(body_a, body_b)
-                if collision:
-                    resolve_collision(collision)
+        if self.recorder is not None:
+            self.recorder.record(self)
 
-        # Check ball-line collisions
-        for body in self.bodies:
-            for p1, p2 in self.static_lines:
-                collision = circle_vs_line(body, p1, p2)
+    def body_rows(self) -> np.ndarray:
+        """Store rows of ``bodies`` in list order.
+
+        Rebuilt whenever the list or the store's rows change, so bodies put
+        into ``bodies`` directly are adopted into the store here.
+        """
+        rows = self._rows
+        if (rows is None or self._row_generation != self.store.generation
+                or self._row_bodies != self.bodies):
+            for body in self.bodies:
+                body.move_to(self.store)
+            rows = self._rows = np.fromiter((body._row for body in self.bodies),
+                                            dtype=np.intp, count=len(self.bodies))
+            self._row_bodies = list(self.bodies)
+            self._row_generation = self.store.generation
+        return rows
+
+    def _integrate(self, dt: float, friction_exp: float) -> None:
+        """Apply gravity and integrate every body (classic Newtonian), as arrays."""
+        store = self.store
+        rows = self.body_rows()
+        if not len(rows):
+            return
+        state = store.state[rows]
+        pos, vel, force = state[:, POS], state[:, VEL], state[:, FORCE]
+        dynamic = ~store.is_static[rows]
+        force[dynamic] += self.gravity * store.mass[rows][dynamic, None]
+
+        vel += force * store.inv_mass[rows][:, None] * dt
+        vel *= ((1.0 - store.friction[rows]) ** friction_exp)[:, None]
+        pos += vel * dt
+        force.fill(0.0)
+        # Clamp position to table bounds
+        radius = store.radius[rows]
+        np.clip(pos[:, 0], settings.TABLE_MARGIN + radius,
+                settings.WINDOW_WIDTH - settings.TABLE_MARGIN - radius, out=pos[:, 0])
+        np.clip(pos[:, 1], settings.TABLE_MARGIN + radius,
+                settings.WINDOW_HEIGHT - settings.TABLE_MARGIN - radius, out=pos[:, 1])
+        store.state[rows] = state
+
+    def _solve_soft_bodies(self, dt: float) -> None:
+        """Solve soft body constraints, batches of soft bodies per task when threaded."""
+        if self.workers > 1 and len(self.soft_bodies) > 1:
+            def solve(batch: List[SoftBody]) -> None:
+                for soft_body in batch:
+                    self._solve_soft_body(soft_body, dt)
+
+            self._run_parallel(self.soft_bodies, solve, weight=lambda sb: len(sb.constraints))
+        else:
+            for soft_body in self.soft_bodies:
+                self._solve_soft_body(soft_body, dt)
+
+    def _solve_soft_body(self, soft_body: SoftBody, dt: float) -> None:
+        """Run ``iterations`` passes over one soft body's constraints.
+
+        Distance constraints are coloured so that no colour shares a moving
+        particle, and each colour is corrected as arrays. Soft bodies holding
+        any other kind of constraint are solved one constraint at a time.
+        """
+        constraints = soft_body.constraints
+        if not constraints:
+            return
+        store = self.store
+        if any(type(c) is not DistanceConstraint or c.p1._store is not store
+               or c.p2._store is not store for c in constraints):
+            for _ in range(self.iterations):
+                soft_body.solve_constraints(dt)
+            return
+
+        n = len(constraints)
+        rows_1 = np.fromiter((c.p1._row for c in constraints), dtype=np.intp, count=n)
+        rows_2 = np.fromiter((c.p2._row for c in constraints), dtype=np.intp, count=n)
+        rows, local = np.unique(np.concatenate((rows_1, rows_2)), return_inverse=True)
+        local = local.reshape(-1)
+        i1, i2 = local[:n], local[n:]
+        dynamic = ~store.is_static[rows]
+        inv_mass = store.inv_mass[rows].astype(float)
+        pos = store.state[rows, POS].astype(float)
+        distance = np.fromiter((c.distance for c in constraints), dtype=float, count=n)
+        stiffness = np.fromiter((c.stiffness for c in constraints), dtype=float, count=n)
+        passes = np.fromiter((c.iterations for c in constraints), dtype=np.intp, count=n)
+
+        # Share of each correction taken by either end; static ends take none
+        inv_sum = inv_mass[i1] + inv_mass[i2]
+        share_1 = np.divide(inv_mass[i1], inv_sum, out=np.zeros(n), where=dynamic[i1] & (inv_sum > 0))
+        share_2 = np.divide(inv_mass[i2], inv_sum, out=np.zeros(n), where=dynamic[i2] & (inv_sum > 0))
+
+        colours = []
+        for idx in colour_pairs(i1, i2, dynamic):
+            colours.append((i1[idx], i2[idx], distance[idx], stiffness[idx],
+                            share_1[idx, None], share_2[idx, None], passes[idx]))
+        for _ in range(self.iterations):
+            for a, b, rest, stiff, s1, s2, reps in colours:
+                for rep in range(int(reps.max())):
+                    if rep:
+                        # Constraints with more iterations of their own keep going
+                        keep = reps > rep
+                        a, b, rest, stiff, s1, s2, reps = (x[keep] for x in (a, b, rest, stiff, s1, s2, reps))
+                    delta = pos[b] - pos[a]
+                    dist = np.sqrt((delta * delta).sum(axis=1))
+                    diff = np.divide(dist - rest, dist, out=np.zeros(len(dist)), where=dist > 0)
+                    correction = delta * (diff * stiff)[:, None]
+                    pos[a] += correction * s1
+                    pos[b] -= correction * s2
+        store.state[rows[dynamic], POS] = pos[dynamic]
+
+    def _run_parallel(self, groups, solve, weight=len) -> None:
+        """Deal the independent groups into batches and run ``solve`` on each across the pool.
+
+        Groups share no dynamic bodies, so the order they finish in cannot
+        change the result; waiting on every batch keeps the substep synchronous.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        batches = balance(groups, self.workers, weight)
+        for future in [self._executor.submit(solve, batch) for batch in batches]:
+            future.result()
+
+    @property
+    def workers(self) -> int:
+        """Threads used to solve independent contact islands and soft bodies."""
+        return self._workers
+
+    @workers.setter
+    def workers(self, workers: int) -> None:
+        if workers != self._workers:
+            # The pool is sized on first use; shut it down so the next one matches
+            self.close()
+        self._workers = workers
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _candidate_pairs(self) -> List[Tuple[int, int]]:
+        """Index pairs (i < j) that overlap and whose layers let them collide.
+
+        Works on arrays of positions, radii and category/mask bits a block
+        of rows at a time, so filtered pairs never reach Python.
+        """
+        bodies = self.bodies
+        n = len(bodies)
+        if n < 2:
+            return []
+        store = self.store
+        rows = self.body_rows()
+        pos = store.state[rows, POS]
+        radius = store.radius[rows]
+        category = store.category[rows]
+        mask = store.mask[rows]
+        static = store.is_static[rows]
+        cols = np.arange(n)
+
+        pairs: List[Tuple[int, int]] = []
+        block = max(1, BROADPHASE_BLOCK // n)
+        for start in range(0, n - 1, block):
+            rows = slice(start, min(start + block, n - 1))
+            row_ids = cols[rows, None]
+            delta = pos[None, :, :] - pos[rows, None, :]
+            reach = radius[rows, None] + radius[None, :]
+            hit = (delta * delta).sum(axis=2) <= reach * reach
+            hit &= cols[None, :] > row_ids
+            hit &= (category[rows, None] & mask[None, :]) != 0
+            hit &= (category[None, :] & mask[rows, None]) != 0
+            hit &= ~(static[rows, None] & static[None, :])
+            for i, j in zip(*np.nonzero(hit)):
+                pairs.append((start + int(i), int(j)))
+
+        if self.ignored_pairs:
+            ignored = self.ignored_pairs
+            pairs = [(i, j) for i, j in pairs
+                     if _pair_key(bodies[i], bodies[j]) not in ignored]
+        return pairs
+
+    def _resolve_collisions(self) -> List[Contact]:
+        """Resolve all collisions and return the solved contacts."""
+        collisions = []
+
+        # Check ball-ball collisions for pairs that pass the broad-phase
+        bodies = self.bodies
+        for i, j in self._candidate_pairs():
+            body_a, body_b = bodies[i], bodies[j]
+            collision = circle_vs_circle(body_a, body_b)
+            if collision:
+                collisions.append(((id(body_a), id(body_b)), collision))
+
+        # Check ball-line collisions against nearby segments only
+        geometry = self.static_geometry
+        starts, directions, lengths = geometry.starts, geometry.directions, geometry.lengths
+        normals = geometry.normals
+        for body in bodies:
+            if not body.mask & self.static_category:
+                continue
+            for i in geometry.query(body.pos, body.radius):
+                collision = circle_vs_segment(body, starts[i], directions[i], normals[i], lengths[i])
                 if collision:
-                    resolve_collision(collision)
-                    # Add additional velocity damping for cushion collisions
-                    body.vel *= CUSHION_DAMPING  # More realistic cushion hit
+                    collisions.append(((id(body), -1 - i), collision))
+
+        for _, info in collisions:
+            if info.penetration > self.stats.max_penetration:
+                self.stats.max_penetration = float(info.penetration)
+        self.stats.contacts = len(collisions)
+
+        contacts = self.contact_manager.update(collisions)
+        islands = build_islands(contacts)
+        self.stats.islands = len(islands)
+        if self.workers > 1 and len(islands) > 1 and len(contacts) >= self.parallel_threshold:
+            # One vectorized solve per worker over its share of the islands
+            def solve(batch: List[List[Contact]]) -> None:
+                self.contact_manager.solve(list(chain.from_iterable(batch)))
+
+            self._run_parallel(islands, solve)
+        else:
+            self.contact_manager.solve(contacts)
+        self.contacts.extend(info for _, info in collisions)
+
+        if CUSHION_DAMPING != 1.0:
+            for contact in contacts:
+                if contact.body_a is None and contact.normal_impulse > 0:
+                    contact.body_b.vel *= CUSHION_DAMPING
+        return contacts
 
     def draw(self, screen: pygame.Surface) -> None:
         """Draw physics objects."""
@@ -96,7 +453,7 @@ class PhysicsWorld:
             soft_body.draw(screen)
 
         # Draw static lines
-        for p1, p2 in self.static_lines:
+        for p1, p2 in self._static_lines:
             pygame.draw.line(screen, (0, 255, 0),
                            (int(p1[0]), int(p1[1])),
                            (int(p2[0]), int(p2[1])), 1)
@@ -107,4 +464,22 @@ class PhysicsWorld:
     def remove_body(self, body):
         """Remove body from world."""
         if body in self.bodies:
-            self.bodies.remove(body) 
\ No newline at end of file
+            self.bodies.remove(body)
+            self._rows = None
+            body.move_to(detached_store(self.dtype))
+        if self.ignored_pairs:
+            key = id(body)
+            self.ignored_pairs = {pair for pair in self.ignored_pairs if key not in pair} 
+
+    def clear_bodies(self) -> None:
+        """Remove every body and soft body, with their ignored pairs and cached contacts."""
+        detached = detached_store(self.dtype)
+        for body in self.bodies:
+            body.move_to(detached)
+        self.bodies.clear()
+        self._rows = None
+        self.soft_bodies.clear()
+        self.ignored_pairs.clear()
+        self.contact_manager.clear()
+        self.contact_events.reset()
+        self.contacts.clear()
@@ -20,6 +20,7 @@ CUE_WIDTH = 4
 GRAVITY = (0, 0)  # No gravity for pool
 TIME_STEP = 1/240
 ITERATIONS = 8
+PRECISION = 'float64'  # Body state storage: 'float64' or 'float32'
 FRICTION = 0.01  # Very low for realistic pool
 RESTITUTION = 0.9  # High for bouncy cushions
 MAX_POWER = 5000.0  # Reduced to prevent excessive speeds